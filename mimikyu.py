@@ -4,90 +4,459 @@ import sqlite3
 import datetime
 import json
 import os
-from PIL import Image, ImageTk
+from PIL import Image, ImageOps, ImageTk
 import google.generativeai as genai
 import threading
 import hashlib
+import io
 import shutil
-from dataclasses import dataclass
+import errno
+import sys
+import heapq
+import mmap
+import tempfile
+import time
+import re
+import mimetypes
+import unicodedata
+import weakref
+import numpy as np
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import List, Optional
 
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
+# Rôles des expéditeurs, stockés en entier dans messages.sender_id
+SENDER_USER = 1
+SENDER_MIMIKYU = 2
+SENDER_IDS = {"User": SENDER_USER, "Mimikyu": SENDER_MIMIKYU}
+SENDER_LABELS = {"User": "Toi", "Mimikyu": "Mimikyu"}
+
+# STRICT n'existe qu'à partir de SQLite 3.37
+STRICT = " STRICT" if sqlite3.sqlite_version_info >= (3, 37, 0) else ""
+
+# Formats acceptés en plus de l'ISO (l'ancien formulaire d'agenda prenait du texte libre)
+DATE_FORMATS = ("%d/%m/%Y %H:%M", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%Y/%m/%d", "%d/%m/%y")
+
+
+def to_epoch(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime.datetime):
+        return int(value.timestamp())
+    if isinstance(value, datetime.date):
+        return int(datetime.datetime.combine(value, datetime.time()).timestamp())
+    value = str(value).strip()
+    try:
+        return int(datetime.datetime.fromisoformat(value).timestamp())
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return int(datetime.datetime.strptime(value, fmt).timestamp())
+        except ValueError:
+            continue
+    return None
+
+
+def format_epoch(value, fmt="%Y-%m-%d"):
+    if value is None:
+        return ""
+    return datetime.datetime.fromtimestamp(value).strftime(fmt)
+
+
+def format_size(size):
+    for unit in ("o", "Ko", "Mo", "Go"):
+        if size < 1024 or unit == "Go":
+            return f"{size:.0f} {unit}" if unit == "o" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def migrate_v1(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sender TEXT NOT NULL,
+            content TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            message_type TEXT DEFAULT 'text'
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            status TEXT DEFAULT 'todo',
+            priority INTEGER DEFAULT 2,
+            created_date TEXT NOT NULL,
+            due_date TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_date TEXT NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT
+        )
+    """)
+
+
+def report_unconverted_dates(cursor):
+    # Les dates illisibles ne sont pas jetées : le texte d'origine est gardé
+    # dans la description (tâches, événements) et signalé ici
+    checks = [
+        ("messages", "timestamp"),
+        ("tasks", "created_date"),
+        ("tasks", "due_date"),
+        ("events", "event_date"),
+    ]
+    for table, column in checks:
+        cursor.execute(f"""
+            SELECT id, {column} FROM {table}
+            WHERE {column} IS NOT NULL AND {column} != '' AND to_epoch({column}) IS NULL
+        """)
+        for row_id, value in cursor.fetchall():
+            print(f"Migration: date illisible dans {table}.{column} (id {row_id}): {value!r}")
+
+
+def migrate_v2(cursor):
+    # Schéma compact : dates en epoch (secondes), expéditeur en entier
+    report_unconverted_dates(cursor)
+
+    cursor.execute(f"""
+        CREATE TABLE senders (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        ){STRICT}
+    """)
+    cursor.executemany("INSERT INTO senders (id, name) VALUES (?, ?)",
+                       [(sender_id, name) for name, sender_id in SENDER_IDS.items()])
+
+    cursor.execute(f"""
+        CREATE TABLE messages_v2 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sender_id INTEGER NOT NULL REFERENCES senders(id),
+            content TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
+            message_type TEXT NOT NULL DEFAULT 'text'
+        ){STRICT}
+    """)
+    cursor.execute("""
+        INSERT INTO messages_v2 (id, sender_id, content, timestamp, message_type)
+        SELECT id,
+               CASE WHEN sender = 'Mimikyu' THEN ? ELSE ? END,
+               content,
+               COALESCE(to_epoch(timestamp), 0),
+               COALESCE(message_type, 'text')
+        FROM messages ORDER BY id
+    """, (SENDER_MIMIKYU, SENDER_USER))
+
+    cursor.execute(f"""
+        CREATE TABLE tasks_v2 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            status TEXT NOT NULL DEFAULT 'todo',
+            priority INTEGER NOT NULL DEFAULT 2,
+            created_date INTEGER NOT NULL,
+            due_date INTEGER
+        ){STRICT}
+    """)
+    cursor.execute("""
+        INSERT INTO tasks_v2 (id, title, description, status, priority, created_date, due_date)
+        SELECT id, title,
+               CASE WHEN due_date != '' AND to_epoch(due_date) IS NULL
+                    THEN TRIM(COALESCE(description, '') || ' (échéance d''origine : ' || due_date || ')')
+                    ELSE description END,
+               COALESCE(status, 'todo'), COALESCE(priority, 2),
+               COALESCE(to_epoch(created_date), 0), to_epoch(due_date)
+        FROM tasks ORDER BY id
+    """)
+
+    cursor.execute(f"""
+        CREATE TABLE events_v2 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_date INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT
+        ){STRICT}
+    """)
+    cursor.execute("""
+        INSERT INTO events_v2 (id, event_date, title, description)
+        SELECT id, COALESCE(to_epoch(event_date), 0), title,
+               CASE WHEN to_epoch(event_date) IS NULL
+                    THEN TRIM(COALESCE(description, '') || ' (date d''origine : ' || event_date || ')')
+                    ELSE description END
+        FROM events ORDER BY id
+    """)
+
+    cursor.execute(f"""
+        CREATE TABLE settings_v2 (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        ) WITHOUT ROWID{"," + STRICT if STRICT else ""}
+    """)
+    cursor.execute("INSERT INTO settings_v2 (key, value) SELECT key, CAST(value AS TEXT) FROM settings")
+
+    for table in ("messages", "tasks", "events", "settings"):
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {table}_v2 RENAME TO {table}")
+
+    cursor.execute("CREATE INDEX idx_events_date ON events (event_date)")
+
+
+def migrate_v3(cursor):
+    # Empreinte sha256 des fichiers du coffre, calculée pendant la copie
+    cursor.execute(f"""
+        CREATE TABLE vault_files (
+            name TEXT PRIMARY KEY,
+            sha256 TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            added_date INTEGER NOT NULL
+        ) WITHOUT ROWID{"," + STRICT if STRICT else ""}
+    """)
+
+
+def migrate_v4(cursor):
+    # Vecteurs de la mémoire sémantique, remplis au fil de save_message
+    cursor.execute(f"""
+        CREATE TABLE message_embeddings (
+            message_id INTEGER PRIMARY KEY REFERENCES messages(id),
+            code BLOB NOT NULL,
+            vector BLOB NOT NULL
+        ){STRICT}
+    """)
+
+
+# Les tâches sans échéance sont rangées après toutes les autres
+NO_DUE_DATE = 2**63 - 1
+TASK_DUE_KEY = f"IFNULL(due_date, {NO_DUE_DATE})"
+TASK_SORT_KEYS = {
+    "id": "id",
+    "title": "title",
+    "status": "status",
+    "priority": "priority",
+    "created_date": "created_date",
+    "due_date": TASK_DUE_KEY,
+}
+TASK_COLUMNS = "id, title, description, status, priority, created_date, due_date"
+TASK_PRIORITIES = {1: "haute", 2: "normale", 3: "basse"}
+
+
+def migrate_v5(cursor):
+    # Un index par clé de tri, préfixé par le statut (le filtre le plus courant) ;
+    # SQLite ajoute l'id en fin d'index, ce qui couvre la pagination par curseur
+    cursor.execute("CREATE INDEX idx_tasks_status_created ON tasks (status, created_date)")
+    cursor.execute("CREATE INDEX idx_tasks_status_priority ON tasks (status, priority)")
+    cursor.execute(f"CREATE INDEX idx_tasks_status_due ON tasks (status, {TASK_DUE_KEY})")
+    cursor.execute("CREATE INDEX idx_tasks_status_title ON tasks (status, title)")
+
+
+def migrate_v6(cursor):
+    # Mêmes clés de tri sans le statut, pour la vue "Toutes", seule ou avec
+    # un filtre de priorité
+    cursor.execute("CREATE INDEX idx_tasks_created ON tasks (created_date)")
+    cursor.execute("CREATE INDEX idx_tasks_priority ON tasks (priority)")
+    cursor.execute(f"CREATE INDEX idx_tasks_due ON tasks ({TASK_DUE_KEY})")
+    cursor.execute("CREATE INDEX idx_tasks_title ON tasks (title)")
+    cursor.execute("CREATE INDEX idx_tasks_priority_created ON tasks (priority, created_date)")
+    cursor.execute(f"CREATE INDEX idx_tasks_priority_due ON tasks (priority, {TASK_DUE_KEY})")
+    cursor.execute("CREATE INDEX idx_tasks_priority_title ON tasks (priority, title)")
+
+
+# MIGRATIONS[i] fait passer la base de la version i à la version i + 1
+MIGRATIONS = [migrate_v1, migrate_v2, migrate_v3, migrate_v4, migrate_v5, migrate_v6]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+EMBEDDING_DIM = 256
+CODE_WORDS = EMBEDDING_DIM // 64
+
+
+class HashedNgramEmbedder:
+    def __init__(self, dim=EMBEDDING_DIM, ngram_sizes=(3, 4)):
+        self.dim = dim
+        self.ngram_sizes = ngram_sizes
+
+    def features(self, text):
+        text = unicodedata.normalize("NFKD", text.lower())
+        text = "".join(c for c in text if not unicodedata.combining(c))
+        grams = Counter()
+        for word in re.findall(r"\w+", text):
+            grams["w:" + word] += 1
+            padded = f" {word} "
+            for n in self.ngram_sizes:
+                for i in range(len(padded) - n + 1):
+                    grams[padded[i:i + n]] += 1
+        return grams
+
+    def embed(self, text):
+        grams = self.features(text)
+        if not grams:
+            return np.zeros(self.dim, dtype=np.float32)
+        # Chaque n-gramme devient un vecteur ±1 tiré de son hash (stable d'une
+        # exécution à l'autre, contrairement à hash())
+        digests = b"".join(hashlib.blake2b(gram.encode(), digest_size=self.dim // 8).digest()
+                           for gram in grams)
+        bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(grams), -1), axis=1)
+        signs = bits.astype(np.float32) * 2 - 1
+        weights = 1 + np.log(np.fromiter(grams.values(), dtype=np.float32, count=len(grams)))
+        vector = weights @ signs
+        return vector / np.linalg.norm(vector)
+
+    def code(self, vector):
+        # Signe de chaque dimension, 256 bits rangés dans 4 mots de 64 bits
+        return np.packbits(vector > 0).view(np.uint64)
+
+
+class SemanticIndex:
+    def __init__(self, words=CODE_WORDS):
+        self.lock = threading.Lock()
+        self.ids = np.empty(0, dtype=np.int64)
+        # Un mot de code par ligne : le calcul de distance lit des tableaux contigus
+        self.codes = np.empty((words, 0), dtype=np.uint64)
+        self.size = 0
+
+    def add(self, ids, codes):
+        # Les ids n'arrivent pas forcément dans l'ordre (rattrapage en tâche
+        # de fond pendant que de nouveaux messages sont indexés)
+        ids = np.asarray(ids, dtype=np.int64)
+        codes = np.asarray(codes, dtype=np.uint64).reshape(len(ids), -1)
+        with self.lock:
+            needed = self.size + len(ids)
+            if needed > len(self.ids):
+                capacity = max(needed, 2 * len(self.ids), 1024)
+                grown_ids = np.empty(capacity, dtype=np.int64)
+                grown_ids[:self.size] = self.ids[:self.size]
+                grown_codes = np.empty((self.codes.shape[0], capacity), dtype=np.uint64)
+                grown_codes[:, :self.size] = self.codes[:, :self.size]
+                self.ids, self.codes = grown_ids, grown_codes
+            self.ids[self.size:needed] = ids
+            self.codes[:, self.size:needed] = codes.T
+            self.size = needed
+
+    def nearest(self, code, count, before_id=None):
+        with self.lock:
+            n = self.size
+            if n == 0:
+                return np.empty(0, dtype=np.int64)
+            # Distance de Hamming entre codes, sans boucle Python sur les lignes
+            distance = np.zeros(n, dtype=np.uint16)
+            scratch = np.empty(n, dtype=np.uint64)
+            for word in range(self.codes.shape[0]):
+                np.bitwise_xor(self.codes[word, :n], code[word], out=scratch)
+                distance += np.bitwise_count(scratch)
+            # Les messages à partir de before_id sont exclus (distance hors échelle)
+            excluded = self.codes.shape[0] * 64 + 1
+            eligible = n
+            if before_id is not None:
+                too_recent = self.ids[:n] >= before_id
+                distance[too_recent] = excluded
+                eligible = n - int(np.count_nonzero(too_recent))
+            if eligible <= count:
+                return self.ids[:n][distance < excluded]
+            # Rayon minimal contenant count voisins, via un histogramme
+            # (bien moins cher qu'un argpartition sur tout l'index)
+            histogram = np.bincount(distance, minlength=excluded + 1)[:excluded]
+            radius = int(np.searchsorted(np.cumsum(histogram), count))
+            selected = np.flatnonzero(distance <= radius)
+            if len(selected) > count:
+                selected = selected[np.argpartition(distance[selected], count)[:count]]
+            return self.ids[selected]
+
+
 class MimikyuDatabase:
     def __init__(self, db_path="mimikyu.db"):
         self.db_path = db_path
+        self.embedder = HashedNgramEmbedder()
+        self.memory = SemanticIndex()
+        # Plus grand id couvert par le chargement en tâche de fond ; les messages
+        # suivants sont indexés directement par save_message
+        self.memory_boundary = None
+        self.memory_lock = threading.Lock()
         self.init_database()
     
     def init_database(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.create_function("to_epoch", 1, to_epoch, deterministic=True)
         cursor = conn.cursor()
-        
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS messages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                sender TEXT NOT NULL,
-                content TEXT NOT NULL,
-                timestamp TEXT NOT NULL,
-                message_type TEXT DEFAULT 'text'
-            )
-        """)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS settings (
-                key TEXT PRIMARY KEY,
-                value TEXT NOT NULL
-            )
-        """)
-        
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                status TEXT DEFAULT 'todo',
-                priority INTEGER DEFAULT 2,
-                created_date TEXT NOT NULL,
-                due_date TEXT
-            )
-        """)
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        # La migration v2 recopie toutes les tables : l'ancienne place est à récupérer
+        needs_vacuum = version < 2 <= SCHEMA_VERSION
+        try:
+            # Chaque migration est appliquée dans sa propre transaction
+            for target in range(version, SCHEMA_VERSION):
+                cursor.execute("BEGIN IMMEDIATE")
+                try:
+                    MIGRATIONS[target](cursor)
+                    cursor.execute(f"PRAGMA user_version = {target + 1}")
+                    cursor.execute("COMMIT")
+                except Exception:
+                    cursor.execute("ROLLBACK")
+                    raise
+        finally:
+            conn.close()
+        if needs_vacuum:
+            self.vacuum()
 
-      
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                event_date TEXT NOT NULL,
-                title TEXT NOT NULL,
-                description TEXT
-            )
-        """)
-        
-        conn.commit()
+    def vacuum(self):
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.execute("VACUUM")
         conn.close()
     
     def save_message(self, sender, content, message_type="text"):
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
-        timestamp = datetime.datetime.now().isoformat()
+        timestamp = int(datetime.datetime.now().timestamp())
         
         cursor.execute("""
-            INSERT INTO messages (sender, content, timestamp, message_type)
+            INSERT INTO messages (sender_id, content, timestamp, message_type)
             VALUES (?, ?, ?, ?)
-        """, (sender, content, timestamp, message_type))
+        """, (SENDER_IDS[sender], content, timestamp, message_type))
+        message_id = cursor.lastrowid
+        
+        code = None
+        if message_type == "text":
+            vector = self.embedder.embed(content)
+            code = self.embedder.code(vector)
+            cursor.execute("""
+                INSERT INTO message_embeddings (message_id, code, vector)
+                VALUES (?, ?, ?)
+            """, (message_id, code.tobytes(), vector.astype(np.float16).tobytes()))
         
         conn.commit()
         conn.close()
+        
+        if code is not None:
+            with self.memory_lock:
+                if self.memory_boundary is not None and message_id > self.memory_boundary:
+                    self.memory.add([message_id], [code])
+        return message_id
     
     def get_recent_messages(self, limit=50):
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
+        # id suit l'ordre d'insertion : tri sur la clé primaire, sans index en plus
         cursor.execute("""
-            SELECT sender, content FROM messages 
-            ORDER BY timestamp DESC 
+            SELECT s.name, m.content, m.message_type FROM messages m
+            JOIN senders s ON s.id = m.sender_id
+            ORDER BY m.id DESC 
             LIMIT ?
         """, (limit,))
         
@@ -95,6 +464,167 @@ class MimikyuDatabase:
         conn.close()
         return messages[::-1]
     
+    def start_memory(self):
+        threading.Thread(target=self.load_memory, daemon=True).start()
+
+    def load_memory(self, batch_size=10000):
+        # Tourne en tâche de fond : les recherches portent sur ce qui est
+        # déjà indexé, sans attendre la fin du chargement
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        with self.memory_lock:
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM messages")
+            boundary = self.memory_boundary = cursor.fetchone()[0]
+        
+        last_id = 0
+        while True:
+            cursor.execute("""
+                SELECT message_id, code FROM message_embeddings
+                WHERE message_id > ? AND message_id <= ?
+                ORDER BY message_id LIMIT ?
+            """, (last_id, boundary, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            ids, codes = zip(*rows)
+            self.memory.add(ids, np.frombuffer(b"".join(codes), dtype=np.uint64))
+            last_id = ids[-1]
+        
+        # Messages enregistrés avant la mémoire sémantique
+        last_id = 0
+        while True:
+            cursor.execute("""
+                SELECT m.id, m.content FROM messages m
+                LEFT JOIN message_embeddings e ON e.message_id = m.id
+                WHERE e.message_id IS NULL AND m.message_type = 'text'
+                  AND m.id > ? AND m.id <= ?
+                ORDER BY m.id LIMIT ?
+            """, (last_id, boundary, batch_size // 10))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            ids, codes, embeddings = [], [], []
+            for message_id, content in rows:
+                vector = self.embedder.embed(content)
+                code = self.embedder.code(vector)
+                ids.append(message_id)
+                codes.append(code)
+                embeddings.append((message_id, code.tobytes(), vector.astype(np.float16).tobytes()))
+            cursor.executemany("""
+                INSERT OR IGNORE INTO message_embeddings (message_id, code, vector)
+                VALUES (?, ?, ?)
+            """, embeddings)
+            conn.commit()
+            self.memory.add(ids, codes)
+            last_id = ids[-1]
+        conn.close()
+
+    def get_message_id_before_recent(self, count):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT MIN(id) FROM (SELECT id FROM messages ORDER BY id DESC LIMIT ?)
+        """, (count,))
+        result = cursor.fetchone()
+        conn.close()
+        return result[0]
+
+    def search_memory(self, query, limit=5, skip_recent=0, min_score=0.25):
+        vector = self.embedder.embed(query)
+        if not vector.any():
+            return []
+        
+        # Les skip_recent derniers messages (texte ou non) sont exclus par id
+        before_id = self.get_message_id_before_recent(skip_recent) if skip_recent else None
+        
+        # Présélection sur les codes binaires, puis cosinus exact sur les candidats
+        candidates = self.memory.nearest(self.embedder.code(vector), limit * 8, before_id)
+        if len(candidates) == 0:
+            return []
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        placeholders = ",".join("?" * len(candidates))
+        cursor.execute(f"""
+            SELECT e.vector, s.name, m.content, m.timestamp FROM message_embeddings e
+            JOIN messages m ON m.id = e.message_id
+            JOIN senders s ON s.id = m.sender_id
+            WHERE e.message_id IN ({placeholders})
+        """, candidates.tolist())
+        rows = cursor.fetchall()
+        conn.close()
+        if not rows:
+            return []
+        
+        vectors = np.frombuffer(b"".join(row[0] for row in rows), dtype=np.float16)
+        scores = vectors.reshape(len(rows), -1).astype(np.float32) @ vector
+        best = np.argsort(-scores)[:limit]
+        return [(rows[i][1], rows[i][2], rows[i][3], float(scores[i]))
+                for i in best if scores[i] >= min_score]
+    
+    def query_tasks(self, status=None, priority=None, due_from=None, due_to=None,
+                    order_by="created_date", descending=False, after=None, limit=50):
+        if order_by not in TASK_SORT_KEYS:
+            raise ValueError(f"Colonne de tri inconnue: {order_by}")
+        sort_key = TASK_SORT_KEYS[order_by]
+        
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if priority is not None:
+            clauses.append("priority = ?")
+            params.append(priority)
+        if due_from is not None:
+            clauses.append(f"{TASK_DUE_KEY} >= ?")
+            params.append(due_from)
+        if due_to is not None:
+            clauses.append(f"{TASK_DUE_KEY} <= ?")
+            params.append(due_to)
+        # Pagination par curseur : on reprend après la dernière ligne vue
+        # au lieu d'un OFFSET qui relit toutes les pages précédentes
+        if after is not None:
+            # La borne sur la seule clé de tri permet aussi à SQLite de
+            # positionner l'index quand la clé est une expression
+            clauses.append(f"{sort_key} {'<=' if descending else '>='} ?")
+            clauses.append(f"({sort_key}, id) {'<' if descending else '>'} (?, ?)")
+            params.extend((after[0], *after))
+        
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        direction = "DESC" if descending else "ASC"
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT {TASK_COLUMNS}, {sort_key} FROM tasks {where}
+            ORDER BY {sort_key} {direction}, id {direction}
+            LIMIT ?
+        """, (*params, limit + 1))
+        rows = cursor.fetchall()
+        conn.close()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = (last[-1], last[0])
+        return [row[:-1] for row in rows[:limit]], next_cursor
+    
+    def get_pending_reminders(self, since):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT 'task', id, title, due_date FROM tasks
+            WHERE due_date > ? AND status != 'completed'
+            UNION ALL
+            SELECT 'event', id, title, event_date FROM events
+            WHERE event_date > ?
+        """, (since, since))
+        
+        reminders = cursor.fetchall()
+        conn.close()
+        return reminders
+    
     def save_setting(self, key, value):
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
@@ -117,11 +647,342 @@ class MimikyuDatabase:
         
         return result[0] if result else default
 
+    def save_vault_file(self, name, sha256, size):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            INSERT OR REPLACE INTO vault_files (name, sha256, size, added_date)
+            VALUES (?, ?, ?, ?)
+        """, (name, sha256, size, int(datetime.datetime.now().timestamp())))
+        
+        conn.commit()
+        conn.close()
+
+    def get_vault_file_hash(self, name):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT sha256 FROM vault_files WHERE name = ?", (name,))
+        result = cursor.fetchone()
+        conn.close()
+        
+        return result[0] if result else None
+
+    def delete_vault_file(self, name):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM vault_files WHERE name = ?", (name,))
+        conn.commit()
+        conn.close()
+
+
+class TransferCancelled(Exception):
+    pass
+
+
+class TransferIntegrityError(Exception):
+    pass
+
+
+@dataclass(eq=False)
+class Transfer:
+    src: str
+    dest: str
+    size: int = 0
+    copied: int = 0
+    started: float = 0.0
+    sha256: Optional[str] = None
+    expected_sha256: Optional[str] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    @property
+    def progress(self):
+        return self.copied / self.size if self.size else 1.0
+
+    @property
+    def throughput(self):
+        elapsed = time.monotonic() - self.started
+        return self.copied / elapsed if elapsed > 0 else 0.0
+
+
+class FileTransferEngine:
+    CHUNK_SIZE = 8 * 1024 * 1024
+    PROGRESS_INTERVAL = 0.1
+    # Erreurs pour lesquelles on repasse sur une copie classique
+    FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+                       errno.EBADF, errno.ENOTSUP, errno.EPERM, errno.ENOTSOCK}
+
+    def __init__(self, dispatch, max_workers=2):
+        # dispatch(fn) exécute fn sur le thread Tk
+        self.dispatch = dispatch
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="vault-transfer")
+        self.active = set()
+
+    def submit(self, src, dest, on_progress=None, on_done=None, expected_sha256=None):
+        transfer = Transfer(src=src, dest=dest, expected_sha256=expected_sha256)
+        self.active.add(transfer)
+        self.executor.submit(self._run, transfer, on_progress, on_done)
+        return transfer
+
+    def shutdown(self):
+        for transfer in list(self.active):
+            transfer.cancel()
+        self.executor.shutdown(wait=True)
+
+    def _run(self, transfer, on_progress, on_done):
+        error = None
+        try:
+            self._copy(transfer, on_progress)
+        except Exception as e:
+            error = e
+        finally:
+            self.active.discard(transfer)
+        if on_done:
+            self.dispatch(lambda: on_done(transfer, error))
+
+    def _copy(self, transfer, on_progress):
+        dest_dir = os.path.dirname(os.path.abspath(transfer.dest))
+        # On écrit dans un fichier temporaire du même dossier puis on renomme :
+        # la destination n'existe jamais à moitié copiée
+        tmp_fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".part", dir=dest_dir)
+        try:
+            with os.fdopen(tmp_fd, "wb") as dst, open(transfer.src, "rb") as src:
+                transfer.size = os.fstat(src.fileno()).st_size
+                transfer.started = time.monotonic()
+                hasher = hashlib.sha256()
+                last_report = [0.0]
+
+                def report(count):
+                    transfer.copied += count
+                    if transfer.cancelled:
+                        raise TransferCancelled()
+                    now = time.monotonic()
+                    if on_progress and (now - last_report[0] >= self.PROGRESS_INTERVAL
+                                        or transfer.copied == transfer.size):
+                        last_report[0] = now
+                        self.dispatch(lambda: on_progress(transfer))
+
+                if not self._copy_zero_copy(src, dst, transfer.size, hasher, report):
+                    self._copy_buffered(src, dst, hasher, report)
+                os.fsync(dst.fileno())
+            transfer.sha256 = hasher.hexdigest()
+            # Vérifié avant le renommage : une copie corrompue n'écrase jamais la destination
+            if transfer.expected_sha256 and transfer.sha256 != transfer.expected_sha256:
+                raise TransferIntegrityError("Le fichier du coffre-fort est corrompu!")
+            try:
+                shutil.copymode(transfer.src, tmp_path)
+            except OSError:
+                pass
+            os.replace(tmp_path, transfer.dest)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _copy_zero_copy(self, src, dst, size, hasher, report):
+        if size == 0:
+            return False
+        if hasattr(os, "copy_file_range"):
+            copy_chunk = lambda offset, count: os.copy_file_range(
+                src.fileno(), dst.fileno(), count, offset, offset)
+        elif hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+            # Ailleurs (macOS), sendfile n'écrit que vers une socket
+            copy_chunk = lambda offset, count: os.sendfile(
+                dst.fileno(), src.fileno(), offset, count)
+        else:
+            return False
+
+        # Le noyau copie les données ; le hash est lu depuis le cache de pages
+        # via mmap, sans tampon intermédiaire
+        with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                offset = 0
+                while offset < size:
+                    try:
+                        copied = copy_chunk(offset, min(self.CHUNK_SIZE, size - offset))
+                    except OSError as e:
+                        if offset == 0 and e.errno in self.FALLBACK_ERRNOS:
+                            return False
+                        raise
+                    if copied == 0:
+                        if offset == 0:
+                            return False
+                        raise OSError(errno.EIO, "Fichier source tronqué pendant la copie")
+                    hasher.update(view[offset:offset + copied])
+                    offset += copied
+                    report(copied)
+            finally:
+                view.release()
+        return True
+
+    def _copy_buffered(self, src, dst, hasher, report):
+        src.seek(0)
+        dst.seek(0)
+        dst.truncate()
+        buffer = bytearray(self.CHUNK_SIZE)
+        view = memoryview(buffer)
+        while True:
+            count = src.readinto(buffer)
+            if not count:
+                break
+            hasher.update(view[:count])
+            dst.write(view[:count])
+            report(count)
+
+class ImageStore:
+    # Images du chat rangées par empreinte : une image envoyée deux fois
+    # n'est stockée qu'une fois
+    # Formats acceptés tels quels par Gemini ; le reste est réencodé
+    UPLOAD_MIME_TYPES = {"image/png", "image/jpeg", "image/webp", "image/heic", "image/heif"}
+    MAX_UPLOAD_SIZE = 1536
+
+    def __init__(self, path="chat_images"):
+        self.path = path
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+
+    def image_path(self, key):
+        return os.path.join(self.path, os.path.basename(key))
+
+    def save(self, data, mime_type):
+        extension = mimetypes.guess_extension(mime_type or "") or ".bin"
+        key = hashlib.sha256(data).hexdigest() + extension
+        path = self.image_path(key)
+        if not os.path.exists(path):
+            tmp_fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".part", dir=self.path)
+            try:
+                with os.fdopen(tmp_fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+        return key
+
+    def import_file(self, filepath):
+        # Appelée hors du thread Tk : décodage et réencodage peuvent être lents
+        with Image.open(filepath) as image:
+            mime_type = Image.MIME.get(image.format)
+            if (mime_type in self.UPLOAD_MIME_TYPES
+                    and max(image.size) <= self.MAX_UPLOAD_SIZE):
+                with open(filepath, "rb") as f:
+                    return self.save(f.read(), mime_type)
+            
+            # Les photos de téléphone stockent leur rotation dans l'EXIF, perdu au réencodage
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((self.MAX_UPLOAD_SIZE, self.MAX_UPLOAD_SIZE), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            # PNG pour les PNG et les images transparentes, JPEG sinon (photos)
+            if (mime_type == "image/png" or image.mode in ("RGBA", "LA", "P")
+                    or "transparency" in image.info):
+                image.convert("RGBA").save(buffer, format="PNG", optimize=True)
+                mime_type = "image/png"
+            else:
+                image.convert("RGB").save(buffer, format="JPEG", quality=90)
+                mime_type = "image/jpeg"
+        return self.save(buffer.getvalue(), mime_type)
+
+    def read_part(self, key):
+        with open(self.image_path(key), "rb") as f:
+            data = f.read()
+        return {"mime_type": mimetypes.guess_type(key)[0] or "image/png", "data": data}
+
+
+class ImageCache:
+    def __init__(self, store, dispatch, max_items=64, size=280, max_workers=2):
+        self.store = store
+        # dispatch(fn) exécute fn sur le thread Tk
+        self.dispatch = dispatch
+        self.max_items = max_items
+        self.size = size
+        self.entries = OrderedDict()
+        self.pending = {}
+        # Bulles qui affichent chaque image : à l'éviction elles la lâchent,
+        # sinon l'image resterait en mémoire tant que la bulle existe
+        self.holders = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="image-decode")
+
+    def get(self, key, callback, holder=None):
+        # Appelée depuis le thread Tk uniquement, comme _ready
+        if holder is not None:
+            self.holders.setdefault(key, weakref.WeakSet()).add(holder)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            callback(self.entries[key])
+            return
+        if key in self.pending:
+            self.pending[key].append(callback)
+            return
+        self.pending[key] = [callback]
+        self.executor.submit(self._decode, key)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _decode(self, key):
+        try:
+            image = Image.open(self.store.image_path(key))
+            # Pour les JPEG, décode directement à une taille réduite
+            image.draft("RGB", (self.size, self.size))
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((self.size, self.size), Image.Resampling.LANCZOS)
+            image.load()
+        except Exception as e:
+            print(f"Erreur chargement image {key}: {e}")
+            image = None
+        self.dispatch(lambda: self._ready(key, image))
+
+    def _ready(self, key, image):
+        ctk_image = None
+        if image is not None:
+            ctk_image = ctk.CTkImage(light_image=image, dark_image=image, size=image.size)
+            self.entries[key] = ctk_image
+            while len(self.entries) > self.max_items:
+                evicted, _ = self.entries.popitem(last=False)
+                for holder in list(self.holders.pop(evicted, ())):
+                    holder.release_image()
+        else:
+            # Échec du décodage : rien à libérer plus tard
+            self.holders.pop(key, None)
+        for callback in self.pending.pop(key, []):
+            callback(ctk_image)
+
+
+@dataclass
+class MimikyuReply:
+    text: str
+    images: List[str] = field(default_factory=list)
+
+
 class MimikyuAI:
-    def __init__(self, db: MimikyuDatabase):
+    DEFAULT_IMAGE_MODEL = "gemini-2.5-flash-image"
+    # Demandes d'image repérées dans le message pour passer au modèle image
+    IMAGE_REQUEST_PATTERN = re.compile(
+        r"\b(images?|photos?|dessins?|dessine|illustrations?|g[ée]n[èe]re)\b", re.IGNORECASE)
+
+    def __init__(self, db: MimikyuDatabase, images: Optional[ImageStore] = None):
         self.db = db
+        self.images = images
         self.api_key = self.db.get_setting("gemini_api_key", "")
+        self.image_model_name = self.db.get_setting("gemini_image_model", self.DEFAULT_IMAGE_MODEL)
         self.model = None
+        self.image_model = None
         if self.api_key:
             self.configure_gemini()
 
@@ -132,25 +993,58 @@ class MimikyuAI:
         except Exception as e:
             print(f"Erreur de configuration Gemini: {e}")
             self.model = None
+        try:
+            self.image_model = None
+            if self.image_model_name:
+                self.image_model = genai.GenerativeModel(
+                    self.image_model_name,
+                    generation_config={"response_modalities": ["TEXT", "IMAGE"]})
+        except Exception as e:
+            print(f"Erreur de configuration du modèle image: {e}")
+            self.image_model = None
     
     def set_api_key(self, api_key: str):
         self.api_key = api_key
         self.db.save_setting("gemini_api_key", api_key)
         self.configure_gemini()
     
+    def set_image_model(self, model_name: str):
+        # Nom vide : pas de génération d'image, tout passe par le modèle texte
+        self.image_model_name = model_name
+        self.db.save_setting("gemini_image_model", model_name)
+        self.configure_gemini()
+    
+    def wants_image(self, user_message):
+        return bool(user_message and self.IMAGE_REQUEST_PATTERN.search(user_message))
+    
+    CONTEXT_SIZE = 15
+    MEMORY_RESULTS = 5
+
     def get_conversation_context(self):
-        recent_messages = self.db.get_recent_messages(15)
+        recent_messages = self.db.get_recent_messages(self.CONTEXT_SIZE)
         context = []
         
-        for sender, content in recent_messages:
+        for sender, content, message_type in recent_messages:
             role = "model" if sender == "Mimikyu" else "user"
+            # Seules les images du message courant sont renvoyées à l'API
+            if message_type == "image":
+                content = "[image]"
             context.append({"role": role, "parts": [content]})
         
         return context
     
-    def call_gemini_api(self, messages):
+    def get_relevant_memories(self, user_message):
+        # Les messages déjà dans le contexte récent ne sont pas repris
+        try:
+            return self.db.search_memory(user_message, self.MEMORY_RESULTS,
+                                         skip_recent=self.CONTEXT_SIZE)
+        except Exception as e:
+            print(f"Erreur mémoire sémantique: {e}")
+            return []
+    
+    def call_gemini_api(self, messages, memories=None, want_image=False):
         if not self.model:
-            return "Désolé, l'IA n'est pas configurée. Va dans les paramètres pour entrer ta clé API Gemini ! >_<"
+            return MimikyuReply("Désolé, l'IA n'est pas configurée. Va dans les paramètres pour entrer ta clé API Gemini ! >_<")
 
         try:
             system_prompt = """tu es un assistant virtuel qui s'appelle mimikyu
@@ -167,28 +1061,49 @@ class MimikyuAI:
             - tu aime parler, ça passe l'ennui.
             - quand je te demande de me donner une image  fait le.
             """
+            if memories:
+                system_prompt += "\nSouvenirs de nos anciennes conversations :\n"
+                for sender, content, timestamp, _ in sorted(memories, key=lambda m: m[2]):
+                    system_prompt += f"- [{format_epoch(timestamp)}] {SENDER_LABELS[sender]}: {content}\n"
             
             full_history = [{"role": "user", "parts": [system_prompt]}]
             full_history.append({"role": "model", "parts": ["ok, compris! je suis prêt. à+ tard! ;)"]})
             full_history.extend(messages)
             
-            response = self.model.generate_content(full_history)
-            return response.text
+            model = self.image_model if want_image and self.image_model else self.model
+            response = model.generate_content(full_history)
+            
+            reply = MimikyuReply("")
+            texts = []
+            for part in response.parts:
+                inline_data = getattr(part, "inline_data", None)
+                if inline_data and inline_data.data and self.images:
+                    reply.images.append(self.images.save(inline_data.data, inline_data.mime_type))
+                elif part.text:
+                    texts.append(part.text)
+            reply.text = "".join(texts)
+            if not reply.text and not reply.images:
+                reply.text = "hmm... j'ai rien trouvé à dire là :s"
+            return reply
             
         except Exception as e:
             print(f"Erreur API Gemini: {e}")
-            return f"oops! l'api a eu un bug... ({e}) essaie encore! :s"
+            return MimikyuReply(f"oops! l'api a eu un bug... ({e}) essaie encore! :s")
     
-    def generate_response(self, user_message: str) -> str:
+    def generate_response(self, user_message: str, image_keys=()) -> MimikyuReply:
         if not self.api_key:
-            return "yo! configure ta clé api gemini dans les paramètres pour qu'on puisse chatter! ;)"
+            return MimikyuReply("yo! configure ta clé api gemini dans les paramètres pour qu'on puisse chatter! ;)")
         
         context = self.get_conversation_context()
-        context.append({"role": "user", "parts": [user_message]})
-        return self.call_gemini_api(context)
+        memories = self.get_relevant_memories(user_message) if user_message else []
+        parts = [self.images.read_part(key) for key in image_keys]
+        parts.append(user_message or "regarde cette image!")
+        context.append({"role": "user", "parts": parts})
+        return self.call_gemini_api(context, memories, self.wants_image(user_message))
 
 class MessageBubble(ctk.CTkFrame):
-    def __init__(self, master, sender, message, is_mimikyu=False, avatar_image=None):
+    def __init__(self, master, sender, message, is_mimikyu=False, avatar_image=None, image=None,
+                 on_image_request=None):
         color = "#2d5a87" if is_mimikyu else "#4a4e69"
         super().__init__(master, fg_color=color, corner_radius=15)
         
@@ -200,24 +1115,149 @@ class MessageBubble(ctk.CTkFrame):
             avatar_label.grid(row=0, column=0, padx=10, pady=10, sticky="n")
         
         # Contenu
-        content_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.content_frame = content_frame = ctk.CTkFrame(self, fg_color="transparent")
         content_frame.grid(row=0, column=1, padx=(0, 10), pady=10, sticky="ew")
+        self.image_label = None
+        # Rappelée pour recharger l'image après qu'elle a été libérée
+        self.on_image_request = on_image_request
         
         sender_label = ctk.CTkLabel(content_frame, text=sender, 
                                   font=ctk.CTkFont(size=12, weight="bold"),
                                   text_color="#00d4ff" if is_mimikyu else "#9476ff")
         sender_label.pack(anchor="w")
         
-        message_label = ctk.CTkLabel(content_frame, text=message, 
-                                   font=ctk.CTkFont(size=11),
-                                   wraplength=350, justify="left")
-        message_label.pack(anchor="w", pady=(5, 0))
+        self.message_label = ctk.CTkLabel(content_frame, text=message, 
+                                        font=ctk.CTkFont(size=11),
+                                        wraplength=350, justify="left")
+        self.message_label.pack(anchor="w", pady=(5, 0))
+        
+        if image:
+            self.set_image(image)
+    
+    def set_image(self, image):
+        # L'image peut arriver après la destruction de la bulle
+        if not self.winfo_exists():
+            return
+        if image is None:
+            self.message_label.configure(text="🖼️ image introuvable")
+            return
+        if self.image_label is not None:
+            self.image_label.destroy()
+        self.message_label.pack_forget()
+        self.image_label = ctk.CTkLabel(self.content_frame, image=image, text="")
+        self.image_label.pack(anchor="w", pady=(5, 0))
+    
+    def release_image(self):
+        # Un label neuf garantit que plus rien ne référence l'image
+        if not self.winfo_exists() or self.image_label is None:
+            return
+        self.image_label.destroy()
+        self.image_label = None
+        self.message_label.configure(text="🖼️ clique pour afficher l'image")
+        self.message_label.pack(anchor="w", pady=(5, 0))
+        if self.on_image_request:
+            self.message_label.bind("<Button-1>", lambda e: self.on_image_request())
+
+class ReminderScheduler:
+    # Tk n'accepte pas de délai au-delà d'un entier 32 bits (~24 jours)
+    MAX_DELAY_MS = 2**31 - 1
+
+    def __init__(self, root, db, notify):
+        self.root = root
+        self.db = db
+        self.notify = notify
+        # Tas de [échéance, n°, (type, id), titre] ; une entrée annulée
+        # garde sa place avec un titre None et est ignorée en sortie
+        self.heap = []
+        self.entries = {}
+        self.counter = 0
+        self.timer = None
+        self.armed_for = None
+
+    def start(self):
+        now = int(time.time())
+        # Les rappels tombés pendant que l'appli était fermée sont rattrapés
+        since = int(self.db.get_setting("reminders_checked_until", now))
+        for kind, item_id, title, due in self.db.get_pending_reminders(since):
+            entry = [due, self.counter, (kind, item_id), title]
+            self.counter += 1
+            self.entries[(kind, item_id)] = entry
+            self.heap.append(entry)
+        heapq.heapify(self.heap)
+        self.db.save_setting("reminders_checked_until", str(max(since, now)))
+        self.arm()
+
+    def schedule(self, kind, item_id, due, title):
+        self.cancel(kind, item_id, rearm=False)
+        if due is None or due <= time.time():
+            self.arm()
+            return
+        entry = [due, self.counter, (kind, item_id), title]
+        self.counter += 1
+        self.entries[(kind, item_id)] = entry
+        heapq.heappush(self.heap, entry)
+        self.arm()
+
+    def cancel(self, kind, item_id, rearm=True):
+        entry = self.entries.pop((kind, item_id), None)
+        if entry is not None:
+            entry[3] = None
+        if rearm:
+            self.arm()
+
+    def arm(self):
+        while self.heap and self.heap[0][3] is None:
+            heapq.heappop(self.heap)
+        if not self.heap:
+            self.disarm()
+            return
+        due = self.heap[0][0]
+        if due == self.armed_for:
+            return
+        self.disarm()
+        delay_ms = max(0, int((due - time.time()) * 1000))
+        self.timer = self.root.after(min(delay_ms, self.MAX_DELAY_MS), self.fire)
+        self.armed_for = due
+
+    def disarm(self):
+        if self.timer is not None:
+            self.root.after_cancel(self.timer)
+        self.timer = None
+        self.armed_for = None
+
+    def fire(self):
+        self.timer = None
+        self.armed_for = None
+        now = time.time()
+        while self.heap and self.heap[0][0] <= now:
+            due, _, key, title = heapq.heappop(self.heap)
+            if title is None:
+                continue
+            del self.entries[key]
+            self.notify(key[0], title)
+        self.db.save_setting("reminders_checked_until", str(int(now)))
+        self.arm()
+
 
 class MimikyuApp:
+    TASK_PAGE_SIZE = 30
+    TASK_STATUS_FILTERS = {"À faire": "todo", "Terminées": "completed", "Toutes": None}
+    # Libellé -> (colonne, ordre décroissant)
+    TASK_SORTS = {
+        "Récentes": ("created_date", True),
+        "Échéance": ("due_date", False),
+        "Priorité": ("priority", False),
+        "Titre": ("title", False),
+    }
+
     def __init__(self, root):
         self.root = root
         self.db = MimikyuDatabase()
-        self.ai = MimikyuAI(self.db)
+        self.image_store = ImageStore()
+        self.ai = MimikyuAI(self.db, self.image_store)
+        self.transfers = FileTransferEngine(lambda fn: self.root.after(0, fn))
+        self.image_cache = ImageCache(self.image_store, lambda fn: self.root.after(0, fn))
+        self.reminders = ReminderScheduler(self.root, self.db, self.notify_reminder)
         self.avatar_image = None
         self.mimikyu_avatar = None
         self.user_avatar = None
@@ -226,6 +1266,8 @@ class MimikyuApp:
         self.load_avatars()
         self.create_widgets()
         self.load_chat_history()
+        self.reminders.start()
+        self.db.start_memory()
         
         self.is_typing = False
         
@@ -318,6 +1360,10 @@ class MimikyuApp:
                                   command=self.send_message)
         send_button.pack(side="right", padx=(5, 10), pady=15)
         
+        attach_button = ctk.CTkButton(input_frame, text="📎", width=40,
+                                    command=self.attach_image)
+        attach_button.pack(side="right", padx=5, pady=15)
+        
         menu_frame = ctk.CTkFrame(self.root, height=50)
         menu_frame.pack(fill="x", padx=10, pady=(0, 10))
         menu_frame.pack_propagate(False)
@@ -334,11 +1380,23 @@ class MimikyuApp:
                               command=command)
             btn.pack(side="left", padx=5, pady=10)
     
-    def add_message_to_chat(self, sender, message):
+    def add_message_to_chat(self, sender, message, message_type="text"):
         is_mimikyu = (sender == "Mimikyu")
         avatar = self.mimikyu_avatar if is_mimikyu else self.user_avatar
         
-        bubble = MessageBubble(self.chat_frame, sender, message, is_mimikyu, avatar)
+        if message_type == "image":
+            # message contient la clé de l'image, décodée hors du thread Tk
+            bubble = MessageBubble(self.chat_frame, SENDER_LABELS[sender], "🖼️ chargement...",
+                                   is_mimikyu, avatar,
+                                   on_image_request=lambda: self.image_cache.get(message, bubble.set_image, bubble))
+            
+            def show_image(image):
+                bubble.set_image(image)
+                self.root.after(100, lambda: self.chat_frame._parent_canvas.yview_moveto(1.0))
+            
+            self.image_cache.get(message, show_image, bubble)
+        else:
+            bubble = MessageBubble(self.chat_frame, SENDER_LABELS[sender], message, is_mimikyu, avatar)
         bubble.pack(fill="x", padx=10, pady=5)
         
         self.root.after(100, lambda: self.chat_frame._parent_canvas.yview_moveto(1.0))
@@ -348,7 +1406,7 @@ class MimikyuApp:
         if not user_message:
             return
         
-        self.add_message_to_chat("Toi", user_message)
+        self.add_message_to_chat("User", user_message)
         self.db.save_message("User", user_message)
         self.message_entry.delete(0, 'end')
         
@@ -356,6 +1414,36 @@ class MimikyuApp:
         self.show_typing_animation()
         threading.Thread(target=self.get_mimikyu_response, args=(user_message,), daemon=True).start()
     
+    def attach_image(self):
+        filepath = filedialog.askopenfilename(
+            title="Choisis une image à envoyer",
+            filetypes=[("Images", "*.png *.jpg *.jpeg *.gif *.bmp *.webp")]
+        )
+        if filepath:
+            # GIF/BMP et grandes photos sont réencodés par ImageStore.import_file
+            caption = self.message_entry.get().strip()
+            self.message_entry.delete(0, 'end')
+            threading.Thread(target=self.import_image, args=(filepath, caption), daemon=True).start()
+    
+    def import_image(self, filepath, caption):
+        try:
+            key = self.image_store.import_file(filepath)
+            self.root.after(10, lambda: self.send_image(key, caption))
+        except Exception as e:
+            error_msg = f"Impossible d'envoyer l'image: {e}"
+            self.root.after(10, lambda: messagebox.showerror("Erreur", error_msg))
+    
+    def send_image(self, key, caption):
+        self.add_message_to_chat("User", key, "image")
+        self.db.save_message("User", key, "image")
+        if caption:
+            self.add_message_to_chat("User", caption)
+            self.db.save_message("User", caption)
+        
+        self.is_typing = True
+        self.show_typing_animation()
+        threading.Thread(target=self.get_mimikyu_response, args=(caption, [key]), daemon=True).start()
+    
     def show_typing_animation(self):
         if hasattr(self, 'typing_bubble'):
             self.typing_bubble.destroy()
@@ -368,20 +1456,32 @@ class MimikyuApp:
         if hasattr(self, 'typing_bubble'):
             self.typing_bubble.destroy()
     
-    def get_mimikyu_response(self, user_message):
+    def get_mimikyu_response(self, user_message, image_keys=()):
         try:
-            response = self.ai.generate_response(user_message)
+            response = self.ai.generate_response(user_message, image_keys)
             self.is_typing = False
             self.root.after(10, lambda: self.display_mimikyu_response(response))
         except Exception as e:
             self.is_typing = False
-            error_msg = f"omg, gros bug! T_T ({str(e)})"
+            error_msg = MimikyuReply(f"omg, gros bug! T_T ({str(e)})")
             self.root.after(10, lambda: self.display_mimikyu_response(error_msg))
     
     def display_mimikyu_response(self, response):
         self.clear_typing_animation()
-        self.add_message_to_chat("Mimikyu", response)
-        self.db.save_message("Mimikyu", response)
+        if response.text:
+            self.add_message_to_chat("Mimikyu", response.text)
+            self.db.save_message("Mimikyu", response.text)
+        for key in response.images:
+            self.add_message_to_chat("Mimikyu", key, "image")
+            self.db.save_message("Mimikyu", key, "image")
+    
+    def notify_reminder(self, kind, title):
+        if kind == "task":
+            reminder = f"hé! la tâche \"{title}\" arrive à échéance, faut s'y mettre! :o"
+        else:
+            reminder = f"psst! c'est le moment de ton événement: {title} ;)"
+        self.add_message_to_chat("Mimikyu", reminder)
+        self.db.save_message("Mimikyu", reminder)
     
     def load_chat_history(self):
         messages = self.db.get_recent_messages(30)
@@ -390,13 +1490,13 @@ class MimikyuApp:
             self.add_message_to_chat("Mimikyu", welcome)
             self.db.save_message("Mimikyu", welcome)
         else:
-            for sender, content in messages:
-                self.add_message_to_chat(sender, content)
+            for sender, content, message_type in messages:
+                self.add_message_to_chat(sender, content, message_type)
     
     def show_ai_settings(self):
         settings_window = ctk.CTkToplevel(self.root)
         settings_window.title("Configuration IA")
-        settings_window.geometry("500x400")
+        settings_window.geometry("500x500")
         
         title_label = ctk.CTkLabel(settings_window, text="Configuration Gemini", 
                                  font=ctk.CTkFont(size=18, weight="bold"))
@@ -412,6 +1512,13 @@ class MimikyuApp:
         self.api_entry.pack(pady=10)
         self.api_entry.insert(0, self.ai.api_key)
         
+        ctk.CTkLabel(api_frame, text="Modèle pour les images (vide = désactivé):",
+                   font=ctk.CTkFont(size=14)).pack(pady=(10, 0))
+        
+        self.image_model_entry = ctk.CTkEntry(api_frame, width=400)
+        self.image_model_entry.pack(pady=10)
+        self.image_model_entry.insert(0, self.ai.image_model_name)
+        
         status_text = "Statut: OK! B-)" if self.ai.model else "Statut: pas de clé! >_>"
         self.status_label = ctk.CTkLabel(settings_window, text=status_text,
                                        font=ctk.CTkFont(size=12, weight="bold"))
@@ -439,6 +1546,7 @@ class MimikyuApp:
     def save_ai_settings(self, window):
         api_key = self.api_entry.get().strip()
         self.ai.set_api_key(api_key)
+        self.ai.set_image_model(self.image_model_entry.get().strip())
         messagebox.showinfo("Succès", "Clé API sauvegardée!")
         status_text = "Statut: OK! B-)" if self.ai.model else "Statut: pas de clé! >_>"
         self.status_label.configure(text=status_text)
@@ -453,7 +1561,7 @@ class MimikyuApp:
     def _test_ai(self):
         try:
             response = self.ai.generate_response("test")
-            messagebox.showinfo("Test", f"Connexion OK! Réponse: {response[:60]}...")
+            messagebox.showinfo("Test", f"Connexion OK! Réponse: {response.text[:60]}...")
         except Exception as e:
             messagebox.showerror("Erreur", f"Problème de connexion: {str(e)}")
 
@@ -487,34 +1595,102 @@ class MimikyuApp:
                            font=ctk.CTkFont(size=20, weight="bold"))
         title.pack(pady=20)
         
+        filter_frame = ctk.CTkFrame(tasks_window, fg_color="transparent")
+        filter_frame.pack(fill="x", padx=20)
+        
+        self.task_status_var = ctk.StringVar(value="À faire")
+        status_filter = ctk.CTkSegmentedButton(filter_frame, values=list(self.TASK_STATUS_FILTERS),
+                                             variable=self.task_status_var,
+                                             command=lambda _: self.reset_task_pages())
+        status_filter.pack(side="left", padx=5)
+        
+        self.task_priority_var = ctk.StringVar(value="Toutes priorités")
+        priority_filter = ctk.CTkOptionMenu(filter_frame, width=130,
+                                          values=["Toutes priorités", *TASK_PRIORITIES.values()],
+                                          variable=self.task_priority_var,
+                                          command=lambda _: self.reset_task_pages())
+        priority_filter.pack(side="left", padx=5)
+        
+        self.task_sort_var = ctk.StringVar(value="Récentes")
+        sort_menu = ctk.CTkOptionMenu(filter_frame, width=110, values=list(self.TASK_SORTS),
+                                    variable=self.task_sort_var,
+                                    command=lambda _: self.reset_task_pages())
+        sort_menu.pack(side="right", padx=5)
+        
         self.tasks_frame = ctk.CTkScrollableFrame(tasks_window)
         self.tasks_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
         btn_frame = ctk.CTkFrame(tasks_window, fg_color="transparent")
         btn_frame.pack(pady=10)
         
+        self.prev_tasks_btn = ctk.CTkButton(btn_frame, text="◀", width=40,
+                                          command=self.previous_task_page)
+        self.prev_tasks_btn.pack(side="left", padx=5)
+        
+        self.task_page_label = ctk.CTkLabel(btn_frame, text="Page 1", width=60)
+        self.task_page_label.pack(side="left", padx=5)
+        
+        self.next_tasks_btn = ctk.CTkButton(btn_frame, text="▶", width=40,
+                                          command=self.next_task_page)
+        self.next_tasks_btn.pack(side="left", padx=5)
+        
         add_btn = ctk.CTkButton(btn_frame, text="➕ Ajouter", command=self.add_task)
         add_btn.pack(side="left", padx=10)
         
+        self.reset_task_pages()
+
+    def reset_task_pages(self):
+        # Curseur de début de chaque page visitée, pour pouvoir revenir en arrière
+        self.task_pages = [None]
         self.load_tasks()
 
+    def next_task_page(self):
+        if self.task_next_cursor is not None:
+            self.task_pages.append(self.task_next_cursor)
+            self.load_tasks()
+
+    def previous_task_page(self):
+        if len(self.task_pages) > 1:
+            self.task_pages.pop()
+            self.load_tasks()
+
     def load_tasks(self):
         for widget in self.tasks_frame.winfo_children():
             widget.destroy()
         
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, title, status FROM tasks ORDER BY created_date DESC")
+        priority_names = {name: level for level, name in TASK_PRIORITIES.items()}
+        order_by, descending = self.TASK_SORTS[self.task_sort_var.get()]
+        tasks, self.task_next_cursor = self.db.query_tasks(
+            status=self.TASK_STATUS_FILTERS[self.task_status_var.get()],
+            priority=priority_names.get(self.task_priority_var.get()),
+            order_by=order_by, descending=descending,
+            after=self.task_pages[-1], limit=self.TASK_PAGE_SIZE)
+        
+        # La page courante a pu se vider (tâches terminées ou supprimées)
+        if not tasks and len(self.task_pages) > 1:
+            self.task_pages.pop()
+            self.load_tasks()
+            return
+        
+        self.task_page_label.configure(text=f"Page {len(self.task_pages)}")
+        self.prev_tasks_btn.configure(state="normal" if len(self.task_pages) > 1 else "disabled")
+        self.next_tasks_btn.configure(state="normal" if self.task_next_cursor else "disabled")
         
-        for task_id, title, status in cursor.fetchall():
+        for task_id, title, description, status, priority, created_date, due_date in tasks:
             task_frame = ctk.CTkFrame(self.tasks_frame)
             task_frame.pack(fill="x", pady=5)
             
             status_icon = "✅" if status == "completed" else "🔲"
             task_text = f"{status_icon} {title}"
+            details = [f"priorité {TASK_PRIORITIES.get(priority, priority)}"]
+            if due_date is not None:
+                details.append(f"échéance {format_epoch(due_date, '%Y-%m-%d %H:%M')}")
+            task_text += f"\n   {' · '.join(details)}"
+            if description:
+                task_text += f"\n   {description}"
             
             task_label = ctk.CTkLabel(task_frame, text=task_text, 
-                                    font=ctk.CTkFont(size=12))
+                                    font=ctk.CTkFont(size=12), justify="left")
             task_label.pack(side="left", padx=10, pady=10)
             
             if status != "completed":
@@ -525,21 +1701,51 @@ class MimikyuApp:
             delete_btn = ctk.CTkButton(task_frame, text="🗑️", width=30,
                                      command=lambda tid=task_id: self.delete_task(tid))
             delete_btn.pack(side="right", padx=5, pady=5)
-        
-        conn.close()
 
     def add_task(self):
-        dialog = ctk.CTkInputDialog(text="Titre de la tâche:", title="Nouvelle Tâche")
-        title = dialog.get_input()
+        task_window = ctk.CTkToplevel(self.root)
+        task_window.title("Nouvelle Tâche")
+        task_window.geometry("400x330")
         
-        if title:
-            conn = sqlite3.connect(self.db.db_path)
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO tasks (title, created_date) VALUES (?, ?)", 
-                         (title, datetime.datetime.now().isoformat()))
-            conn.commit()
-            conn.close()
-            self.load_tasks()
+        ctk.CTkLabel(task_window, text="Titre de la tâche:", 
+                   font=ctk.CTkFont(size=12)).pack(pady=10)
+        title_entry = ctk.CTkEntry(task_window)
+        title_entry.pack(pady=5)
+        
+        ctk.CTkLabel(task_window, text="Échéance (YYYY-MM-DD HH:MM, optionnel):", 
+                   font=ctk.CTkFont(size=12)).pack(pady=10)
+        due_entry = ctk.CTkEntry(task_window)
+        due_entry.pack(pady=5)
+        
+        ctk.CTkLabel(task_window, text="Priorité:", 
+                   font=ctk.CTkFont(size=12)).pack(pady=10)
+        priority_menu = ctk.CTkOptionMenu(task_window, values=list(TASK_PRIORITIES.values()))
+        priority_menu.set(TASK_PRIORITIES[2])
+        priority_menu.pack(pady=5)
+        
+        def save_task():
+            title = title_entry.get()
+            due = due_entry.get().strip()
+            priority = {name: level for level, name in TASK_PRIORITIES.items()}[priority_menu.get()]
+            
+            if title:
+                due_date = to_epoch(due)
+                if due and due_date is None:
+                    messagebox.showerror("Erreur", "Échéance invalide! Utilise le format YYYY-MM-DD HH:MM.")
+                    return
+                conn = sqlite3.connect(self.db.db_path)
+                cursor = conn.cursor()
+                cursor.execute("INSERT INTO tasks (title, priority, created_date, due_date) VALUES (?, ?, ?, ?)", 
+                             (title, priority, int(datetime.datetime.now().timestamp()), due_date))
+                task_id = cursor.lastrowid
+                conn.commit()
+                conn.close()
+                self.reminders.schedule("task", task_id, due_date, title)
+                self.load_tasks()
+                task_window.destroy()
+        
+        save_btn = ctk.CTkButton(task_window, text="Sauver", command=save_task)
+        save_btn.pack(pady=20)
 
     def complete_task(self, task_id):
         conn = sqlite3.connect(self.db.db_path)
@@ -547,6 +1753,7 @@ class MimikyuApp:
         cursor.execute("UPDATE tasks SET status = 'completed' WHERE id = ?", (task_id,))
         conn.commit()
         conn.close()
+        self.reminders.cancel("task", task_id)
         self.load_tasks()
 
     def delete_task(self, task_id):
@@ -556,6 +1763,7 @@ class MimikyuApp:
             cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
             conn.commit()
             conn.close()
+            self.reminders.cancel("task", task_id)
             self.load_tasks()
 
     def show_agenda(self):
@@ -591,7 +1799,7 @@ class MimikyuApp:
             event_frame = ctk.CTkFrame(self.events_frame)
             event_frame.pack(fill="x", pady=5)
             
-            event_text = f"📅 {date} - {title}"
+            event_text = f"📅 {format_epoch(date)} - {title}"
             if desc:
                 event_text += f"\n   {desc}"
             
@@ -631,12 +1839,18 @@ class MimikyuApp:
             desc = desc_entry.get()
             
             if date and title:
+                event_date = to_epoch(date)
+                if event_date is None:
+                    messagebox.showerror("Erreur", "Date invalide! Utilise le format YYYY-MM-DD.")
+                    return
                 conn = sqlite3.connect(self.db.db_path)
                 cursor = conn.cursor()
                 cursor.execute("INSERT INTO events (event_date, title, description) VALUES (?, ?, ?)", 
-                             (date, title, desc))
+                             (event_date, title, desc))
+                event_id = cursor.lastrowid
                 conn.commit()
                 conn.close()
+                self.reminders.schedule("event", event_id, event_date, title)
                 self.load_events()
                 event_window.destroy()
         
@@ -650,6 +1864,7 @@ class MimikyuApp:
             cursor.execute("DELETE FROM events WHERE id = ?", (event_id,))
             conn.commit()
             conn.close()
+            self.reminders.cancel("event", event_id)
             self.load_events()
 
     def show_file_vault(self):
@@ -687,6 +1902,9 @@ class MimikyuApp:
         self.files_frame = ctk.CTkScrollableFrame(vault_window)
         self.files_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
+        self.transfers_frame = ctk.CTkFrame(vault_window, fg_color="transparent")
+        self.transfers_frame.pack(fill="x", padx=20)
+        
         btn_frame = ctk.CTkFrame(vault_window, fg_color="transparent")
         btn_frame.pack(pady=10)
         
@@ -701,6 +1919,9 @@ class MimikyuApp:
             widget.destroy()
         
         for filename in os.listdir(self.vault_path):
+            # Fichiers .part des copies en cours
+            if filename.startswith(".") and filename.endswith(".part"):
+                continue
             file_frame = ctk.CTkFrame(self.files_frame)
             file_frame.pack(fill="x", pady=5)
             
@@ -716,30 +1937,79 @@ class MimikyuApp:
                                      command=lambda f=filename: self.delete_file_from_vault(f))
             delete_btn.pack(side="right", padx=5, pady=5)
 
+    def start_transfer(self, src, dest, on_complete, expected_sha256=None):
+        row = ctk.CTkFrame(self.transfers_frame)
+        row.pack(fill="x", pady=5)
+        
+        name_label = ctk.CTkLabel(row, text=f"⏳ {os.path.basename(src)}", 
+                                font=ctk.CTkFont(size=12))
+        name_label.pack(anchor="w", padx=10, pady=(5, 0))
+        
+        progress_bar = ctk.CTkProgressBar(row)
+        progress_bar.set(0)
+        progress_bar.pack(side="left", fill="x", expand=True, padx=10, pady=5)
+        
+        speed_label = ctk.CTkLabel(row, text="0%", width=140, font=ctk.CTkFont(size=11))
+        speed_label.pack(side="left", padx=5)
+        
+        def on_progress(transfer):
+            if not row.winfo_exists():
+                return
+            progress_bar.set(transfer.progress)
+            speed_label.configure(
+                text=f"{transfer.progress:.0%} - {format_size(transfer.throughput)}/s")
+        
+        def on_done(transfer, error):
+            # Le coffre a pu être fermé pendant la copie
+            if row.winfo_exists():
+                row.destroy()
+            on_complete(transfer, error)
+        
+        transfer = self.transfers.submit(src, dest, on_progress, on_done, expected_sha256)
+        cancel_btn = ctk.CTkButton(row, text="✖", width=30, command=transfer.cancel)
+        cancel_btn.pack(side="right", padx=5, pady=5)
+
     def add_file_to_vault(self):
         filepath = filedialog.askopenfilename(title="Choisir un fichier à sécuriser")
         if filepath:
-            try:
-                shutil.copy(filepath, self.vault_path)
-                self.load_vault_files()
+            filename = os.path.basename(filepath)
+            
+            def on_complete(transfer, error):
+                if isinstance(error, TransferCancelled):
+                    return
+                if error:
+                    messagebox.showerror("Erreur", f"Impossible d'ajouter le fichier: {error}")
+                    return
+                self.db.save_vault_file(filename, transfer.sha256, transfer.size)
+                if self.files_frame.winfo_exists():
+                    self.load_vault_files()
                 messagebox.showinfo("Succès", "Fichier ajouté au coffre-fort!")
-            except Exception as e:
-                messagebox.showerror("Erreur", f"Impossible d'ajouter le fichier: {e}")
+            
+            self.start_transfer(filepath, os.path.join(self.vault_path, filename), on_complete)
 
     def download_file_from_vault(self, filename):
         src = os.path.join(self.vault_path, filename)
         dest = filedialog.asksaveasfilename(initialfile=filename)
         if dest:
-            try:
-                shutil.copy(src, dest)
-                messagebox.showinfo("Succès", "Fichier téléchargé!")
-            except Exception as e:
-                messagebox.showerror("Erreur", f"Impossible de télécharger: {e}")
+            expected = self.db.get_vault_file_hash(filename)
+            
+            def on_complete(transfer, error):
+                if isinstance(error, TransferCancelled):
+                    return
+                if isinstance(error, TransferIntegrityError):
+                    messagebox.showerror("Erreur", str(error))
+                elif error:
+                    messagebox.showerror("Erreur", f"Impossible de télécharger: {error}")
+                else:
+                    messagebox.showinfo("Succès", "Fichier téléchargé!")
+            
+            self.start_transfer(src, dest, on_complete, expected)
 
     def delete_file_from_vault(self, filename):
         if messagebox.askyesno("Confirmation", f"Supprimer {filename}?"):
             try:
                 os.remove(os.path.join(self.vault_path, filename))
+                self.db.delete_vault_file(filename)
                 self.load_vault_files()
                 messagebox.showinfo("Succès", "Fichier supprimé!")
             except Exception as e:
@@ -765,8 +2035,10 @@ class MimikyuApp:
         history_text.pack(fill="both", expand=True, padx=10, pady=10)
         
         messages = self.db.get_recent_messages(50)
-        for sender, content in messages:
-            history_text.insert("end", f"- {sender}: {content}\n\n")
+        for sender, content, message_type in messages:
+            if message_type == "image":
+                content = "🖼️ [image]"
+            history_text.insert("end", f"- {SENDER_LABELS[sender]}: {content}\n\n")
         
         history_text.configure(state="disabled")
 
@@ -775,6 +2047,8 @@ def main():
     app = MimikyuApp(root)
     
     root.mainloop()
+    app.image_cache.shutdown()
+    app.transfers.shutdown()
 
 if __name__ == "__main__":
     main()